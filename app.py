@@ -1,112 +1,53 @@
+import math
+
 import streamlit as st
-import numpy as np
-
-# Model coefficients from training output
-
-INTERCEPT = 11.4917
-
-# District coefficients (baseline is Barking and Dagenham = 0)
-DISTRICT_COEFS = {
-    "Barking and Dagenham": 0.0,
-    "Barnet": 0.4975,
-    "Bexley": -0.1113,
-    "Brent": 0.6007,
-    "Bromley": 0.1366,
-    "Camden": 0.8878,
-    "City of London": 0.5691,
-    "City of Westminster": 0.9886,
-    "Croydon": 0.1507,
-    "Ealing": 0.6350,
-    "Enfield": 0.3132,
-    "Greenwich": 0.0358,
-    "Hackney": 0.5290,
-    "Hammersmith and Fulham": 0.8440,
-    "Haringey": 0.4812,
-    "Harrow": 0.5155,
-    "Havering": 0.0895,
-    "Hillingdon": 0.5468,
-    "Hounslow": 0.7711,
-    "Islington": 0.7516,
-    "Kensington and Chelsea": 1.2278,
-    "Kingston upon Thames": 0.3462,
-    "Lambeth": 0.4489,
-    "Lewisham": 0.1146,
-    "Merton": 0.4242,
-    "Newham": 0.0961,
-    "Redbridge": 0.1090,
-    "Richmond upon Thames": 0.7332,
-    "Southwark": 0.3791,
-    "Sutton": 0.5576,
-    "Tower Hamlets": 0.4349,
-    "Waltham Forest": 0.1827,
-    "Wandsworth": 0.5601,
-}
-
-# Property type coefficients
-PROPERTY_TYPE_COEFS = {
-    "Detached Bungalow": 0.1111,
-    "Detached House": 0.1808,
-    "Flat": 0.0464,
-    "House": -0.0928,
-    "Maisonette": -0.0150,
-    "Semi-Detached Bungalow": 0.0638,
-    "Semi-Detached House": 0.0430,
-    "Terraced House": 0.0289,
-}
-
-# Other coefficients
-COEF_OLD_NEW = 0.2060
-COEF_TOTAL_FLOOR_AREA_SCALED = 0.3229
-COEF_NUMBER_HABITABLE_ROOMS_SCALED = 0.0038
-COEF_SALE_YEAR_SCALED = 0.6003
-
-# Scaling parameters (floor area is log-transformed before scaling)
-FLOOR_AREA_LOG_MEAN = 4.386511603767719
-FLOOR_AREA_LOG_STD = 0.47257771853330777
-ROOMS_MEAN = 3.9727626069998228
-ROOMS_STD = 1.7406400213620896
-SALE_YEAR_MEAN = 2008.7952931442833
-SALE_YEAR_STD = 8.688165520246507
-
-# Model error (for confidence interval)
-RMSE_LOG = 0.3807
-
-
-def predict_price(district: str, property_type: str, floor_area: float, 
-                  num_rooms: int, is_new_build: bool) -> float:
+
+from model import (
+    FLOOR_AREA_MAX,
+    FLOOR_AREA_MIN,
+    FLOOR_AREA_STEP,
+    ROOMS_MAX,
+    ROOMS_MIN,
+    SALE_YEAR,
+    ModelParams,
+    available_versions,
+    load_model,
+    predict_price,
+    price_breakdown,
+)
+
+
+@st.cache_resource
+def _load_model(version: str) -> ModelParams:
     """
-    Predict house price using the linear regression coefficients.
-    Returns price in GBP.
+    Build the model parameters once per process and version; reruns reuse the same object.
     """
-    # Start with intercept
-    log_price = INTERCEPT
-    
-    # Add district effect
-    log_price += DISTRICT_COEFS.get(district, 0.0)
-    
-    # Add property type effect
-    log_price += PROPERTY_TYPE_COEFS.get(property_type, 0.0)
-    
-    # Add new build effect
-    if is_new_build:
-        log_price += COEF_OLD_NEW
-    
-    # Add sale year effect (assume 2025)
-    sale_year_scaled = (2025 - SALE_YEAR_MEAN) / SALE_YEAR_STD
-    log_price += COEF_SALE_YEAR_SCALED * sale_year_scaled
-    
-    # Add scaled continuous variables (floor area is log-transformed first)
-    floor_area_log = np.log1p(floor_area)
-    floor_area_scaled = (floor_area_log - FLOOR_AREA_LOG_MEAN) / FLOOR_AREA_LOG_STD
-    rooms_scaled = (num_rooms - ROOMS_MEAN) / ROOMS_STD
-    
-    log_price += COEF_TOTAL_FLOOR_AREA_SCALED * floor_area_scaled
-    log_price += COEF_NUMBER_HABITABLE_ROOMS_SCALED * rooms_scaled
+    return load_model(version)
+
+
+def _render_breakdown(model: ModelParams, inputs: tuple) -> None:
+    """
+    Show how an estimate was calculated; only called while the breakdown is toggled on.
+    """
+    district_idx, property_type_idx, floor_area, num_rooms, is_new_build = inputs
+    multipliers = price_breakdown(model, *inputs)
     
-    # Convert from log price to actual price
-    price = np.exp(log_price)
+    # The estimate is the base price times one multiplier per factor
+    st.markdown(f"""
+    | Factor | Multiplier |
+    | --- | --- |
+    | Base price | £{multipliers["base_price"]:,.0f} |
+    | Borough: {model.district_names[district_idx]} | ×{multipliers["district"]:.3f} |
+    | Property type: {model.property_type_names[property_type_idx]} | ×{multipliers["property_type"]:.3f} |
+    | {"New build" if is_new_build else "Existing property"} | ×{multipliers["new_build"]:.3f} |
+    | Sale year: {SALE_YEAR} | ×{multipliers["sale_year"]:.3f} |
+    | Floor area: {floor_area} m² | ×{multipliers["floor_area"]:.3f} |
+    | Habitable rooms: {num_rooms} | ×{multipliers["rooms"]:.3f} |
+    """)
     
-    return price
+    st.markdown("""
+    We matched 1.1 million historic transactions to official Energy Performance Certificates and enriched them with neighbourhood metrics like crime rates, tube proximity, and deprivation indices. The resulting 34-feature model explains 82% of price variation across London boroughs. The likely range shown reflects typical model uncertainty, about two-thirds of actual sale prices fall within this band.
+    """)
 
 # STREAMLIT UI
 
@@ -121,76 +62,85 @@ st.markdown("Get an instant price estimate for properties across London boroughs
 
 st.divider()
 
-# Input form
-col1, col2 = st.columns(2)
+# Model selection
+versions = available_versions()
+model_version = st.sidebar.selectbox("Model version", options=versions, index=len(versions) - 1)
+M = _load_model(model_version)
 
-with col1:
-    district = st.selectbox(
-        "Borough",
-        options=sorted(DISTRICT_COEFS.keys()),
-        index=sorted(DISTRICT_COEFS.keys()).index("Hackney")
-    )
+# Input form
+with st.form("price_form"):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Selectboxes return category codes; format_func supplies the labels
+        district_idx = st.selectbox(
+            "Borough",
+            options=range(len(M.district_names)),
+            format_func=M.district_names.__getitem__,
+            index=M.default_district_idx
+        )
     
-    property_type = st.selectbox(
-        "Property Type",
-        options=list(PROPERTY_TYPE_COEFS.keys()),
-        index=2  # Flat
-    )
+        property_type_idx = st.selectbox(
+            "Property Type",
+            options=range(len(M.property_type_names)),
+            format_func=M.property_type_names.__getitem__,
+            index=2  # Flat
+        )
     
-    is_new_build = st.radio(
-        "Property Age",
-        options=["Existing Property", "New Build"],
-        index=0,
-        horizontal=True
-    ) == "New Build"
-
-with col2:
-    floor_area = st.number_input(
-        "Total Floor Area (m²)",
-        min_value=15,
-        max_value=500,
-        value=75,
-        step=5
-    )
+        is_new_build = st.radio(
+            "Property Age",
+            options=["Existing Property", "New Build"],
+            index=0,
+            horizontal=True
+        ) == "New Build"
+
+    with col2:
+        # Integer bounds and step keep floor_area an int (a stable predict_price cache key)
+        floor_area = st.number_input(
+            "Total Floor Area (m²)",
+            min_value=FLOOR_AREA_MIN,
+            max_value=FLOOR_AREA_MAX,
+            value=75,
+            step=FLOOR_AREA_STEP
+        )
+    
+        num_rooms = st.slider(
+            "Number of Habitable Rooms",
+            min_value=ROOMS_MIN,
+            max_value=ROOMS_MAX,
+            value=4
+        )
+
+    st.divider()
     
-    num_rooms = st.slider(
-        "Number of Habitable Rooms",
-        min_value=1,
-        max_value=10,
-        value=4
+    # Widgets inside the form only trigger a rerun when it is submitted
+    submitted = st.form_submit_button("Get Price Estimate", type="primary", use_container_width=True)
+
+# Keep the submitted inputs so reruns that don't come from the form (such as
+# toggling the breakdown) still show the last estimate
+if submitted:
+    st.session_state["estimate"] = (
+        model_version,
+        (district_idx, property_type_idx, floor_area, num_rooms, is_new_build),
     )
 
-st.divider()
-
 # Calculate and display prediction
-if st.button("Get Price Estimate", type="primary", use_container_width=True):
-    price = predict_price(district, property_type, floor_area, num_rooms, is_new_build)
+estimate = st.session_state.get("estimate")
+if estimate is not None and estimate[0] == model_version:
+    inputs = estimate[1]
+    price = predict_price(M, *inputs)
     
     # Calculate ±1 std dev range
-    log_price = np.log(price)
-    price_low = np.exp(log_price - RMSE_LOG)
-    price_high = np.exp(log_price + RMSE_LOG)
+    log_price = math.log(price)
+    price_low = math.exp(log_price - M.rmse_log)
+    price_high = math.exp(log_price + M.rmse_log)
     
     st.success(f"### Estimated Price: £{price:,.0f}")
     st.markdown(f"*Likely range: £{price_low:,.0f} – £{price_high:,.0f}*")
     
-    # Show breakdown
-    with st.expander("See how this was calculated"):
-        base_price = np.exp(INTERCEPT)
-        district_multiplier = np.exp(DISTRICT_COEFS.get(district, 0))
-        property_multiplier = np.exp(PROPERTY_TYPE_COEFS.get(property_type, 0))
-        new_build_multiplier = np.exp(COEF_OLD_NEW) if is_new_build else 1.0
-        sale_year_scaled = (2025 - SALE_YEAR_MEAN) / SALE_YEAR_STD
-        sale_year_multiplier = np.exp(COEF_SALE_YEAR_SCALED * sale_year_scaled)
-        floor_area_log = np.log1p(floor_area)
-        floor_area_scaled = (floor_area_log - FLOOR_AREA_LOG_MEAN) / FLOOR_AREA_LOG_STD
-        rooms_scaled = (num_rooms - ROOMS_MEAN) / ROOMS_STD
-        floor_area_multiplier = np.exp(COEF_TOTAL_FLOOR_AREA_SCALED * floor_area_scaled)
-        rooms_multiplier = np.exp(COEF_NUMBER_HABITABLE_ROOMS_SCALED * rooms_scaled)
-        
-        st.markdown(f"""
-        We matched 1.1 million historic transactions to official Energy Performance Certificates and enriched them with neighbourhood metrics like crime rates, tube proximity, and deprivation indices. The resulting 34-feature model explains 82% of price variation across London boroughs. The likely range shown reflects typical model uncertainty, about two-thirds of actual sale prices fall within this band.
-        """)
+    # Show breakdown (computed only while the toggle is on)
+    if st.toggle("See how this was calculated", key="show_breakdown"):
+        _render_breakdown(M, inputs)
 
 st.divider()
 
@@ -0,0 +1,54 @@
+"""
+Precompute the full price table for each model version.
+
+Writes models/<version>_prices.npy, which app.py memory-maps at startup so a
+prediction is a single array read, plus models/<version>_prices.sha256 holding
+the key of what it was built from (the JSON, input grid and table format).
+Re-run after editing a models/<version>.json. A process that loads a model while
+its table is out of date ignores the saved table and rebuilds it in memory.
+
+An already-running app keeps the model it cached on first use, so it doesn't see
+the edited JSON or the new table until it is restarted. Both files are written
+to temporary files and then swapped into place, so rebuilding while the app is
+up never truncates a table it still has memory-mapped.
+
+    python build_price_table.py [version ...]
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from model import available_versions, compute_price_table, price_table_paths
+
+
+def _replace_atomically(path: Path, write) -> None:
+    """
+    Write a new file next to path with write(f), then swap it in with os.replace.
+    The new file has its own inode, so existing memory maps of path stay valid.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def main(versions: list[str]) -> None:
+    for version in versions or available_versions():
+        # Built straight from the JSON, so an existing table is never opened
+        prices, table_key = compute_price_table(version)
+        prices_path, hash_path = price_table_paths(version)
+        # Table first, key second: a reader never sees a new key next to an old table
+        _replace_atomically(prices_path, lambda f: np.save(f, prices))
+        _replace_atomically(hash_path, lambda f: f.write(f"{table_key}\n".encode("utf-8")))
+        print(f"{version}: wrote {prices_path.name} {prices.shape} ({prices.nbytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,149 @@
+"""
+Check predict_price against the regression formula worked straight from the JSON.
+
+Covers every point of the UI input grid plus off-grid inputs, for the saved
+(memory-mapped) table and for each case where load_model must ignore it and
+rebuild it in memory: an edited JSON, a changed input grid and a table of the
+wrong shape. Exits non-zero on the first failure.
+
+    python check_price_table.py [version ...]
+"""
+import json
+import shutil
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+import model
+from model import available_versions, load_model, predict_price, price_table_paths
+
+# Typed-in floor areas / room counts that miss the widget grid (or land on it as floats)
+OFF_GRID_INPUTS = [(16, 3), (77, 4), (75.5, 3), (75.0, 3), (10, 1), (520, 10), (100, 12)]
+
+
+def _direct_log_price(cfg: dict, district: str, property_type: str, floor_area, num_rooms,
+                      is_new_build: bool):
+    """
+    Log price with every term scaled as in training (floor area is log-transformed first).
+    """
+    floor_area_scaled = (np.log1p(floor_area) - cfg["floor_area_log_mean"]) / cfg["floor_area_log_std"]
+    rooms_scaled = (num_rooms - cfg["rooms_mean"]) / cfg["rooms_std"]
+    sale_year_scaled = (model.SALE_YEAR - cfg["sale_year_mean"]) / cfg["sale_year_std"]
+    return (
+        cfg["intercept"]
+        + cfg["district_coefs"][district]
+        + cfg["property_type_coefs"][property_type]
+        + cfg["coef_old_new"] * is_new_build
+        + cfg["coef_sale_year_scaled"] * sale_year_scaled
+        + cfg["coef_total_floor_area_scaled"] * floor_area_scaled
+        + cfg["coef_number_habitable_rooms_scaled"] * rooms_scaled
+    )
+
+
+def _check_prices(params: model.ModelParams, cfg: dict) -> int:
+    """
+    Compare predict_price with the direct formula; returns the number of points checked.
+    Prices must agree to 1e-12 relative and round to the same displayed whole pound.
+    """
+    floor_areas = np.arange(model.FLOOR_AREA_MIN, model.FLOOR_AREA_MAX + 1, model.FLOOR_AREA_STEP)
+    rooms = np.arange(model.ROOMS_MIN, model.ROOMS_MAX + 1)
+    checked = 0
+    for d, district in enumerate(params.district_names):
+        for p, property_type in enumerate(params.property_type_names):
+            for is_new_build in (False, True):
+                expected = np.exp(_direct_log_price(
+                    cfg, district, property_type, floor_areas[:, None], rooms[None, :], is_new_build
+                ))
+                points = [
+                    (int(fa), int(r), expected[i, j])
+                    for i, fa in enumerate(floor_areas) for j, r in enumerate(rooms)
+                ]
+                points += [
+                    (fa, r, np.exp(_direct_log_price(cfg, district, property_type, fa, r, is_new_build)))
+                    for fa, r in OFF_GRID_INPUTS
+                ]
+                for fa, r, want in points:
+                    got = predict_price(params, d, p, fa, r, is_new_build)
+                    if abs(got / want - 1) > 1e-12 or f"{got:,.0f}" != f"{want:,.0f}":
+                        raise AssertionError(
+                            f"{district} / {property_type} / new build {is_new_build} / "
+                            f"{fa} m² / {r} rooms: predict_price £{got:,.2f}, formula £{want:,.2f}"
+                        )
+                    checked += 1
+    return checked
+
+
+def _load_expecting_rebuild(version: str) -> model.ModelParams:
+    """
+    load_model, asserting it warned about the saved table and built its own in memory.
+    """
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        params = load_model(version)
+    if not any("out of date" in str(w.message) for w in caught):
+        raise AssertionError("load_model did not warn about the out-of-date price table")
+    if isinstance(params.prices, np.memmap):
+        raise AssertionError("load_model memory-mapped an out-of-date price table")
+    return params
+
+
+def _read_cfg(version: str) -> dict:
+    return json.loads((model.MODELS_DIR / f"{version}.json").read_text(encoding="utf-8"))
+
+
+def check_version(version: str) -> None:
+    # Saved table, as the app loads it
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        params = load_model(version)
+    if not isinstance(params.prices, np.memmap):
+        raise AssertionError(f"{version}: saved price table was not used; run build_price_table.py")
+    print(f"{version}: saved table, {_check_prices(params, _read_cfg(version))} prices match")
+
+    # Each fallback runs against a scratch copy of MODELS_DIR
+    models_dir = model.MODELS_DIR
+    grid = model.FLOOR_AREA_MIN, model.FLOOR_AREA_MAX
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            model.MODELS_DIR = Path(tmp)
+            prices_path, _ = price_table_paths(version)
+
+            # JSON edited after the table was built
+            shutil.copytree(models_dir, tmp, dirs_exist_ok=True)
+            cfg = _read_cfg(version)
+            cfg["intercept"] += 0.01
+            (model.MODELS_DIR / f"{version}.json").write_text(json.dumps(cfg), encoding="utf-8")
+            params = _load_expecting_rebuild(version)
+            print(f"{version}: edited JSON, {_check_prices(params, cfg)} prices match")
+
+            # Input grid shifted in model.py after the table was built
+            shutil.copytree(models_dir, tmp, dirs_exist_ok=True)
+            model.FLOOR_AREA_MIN, model.FLOOR_AREA_MAX = grid[0] + 5, grid[1] + 5
+            params = _load_expecting_rebuild(version)
+            print(f"{version}: shifted grid, {_check_prices(params, _read_cfg(version))} prices match")
+            model.FLOOR_AREA_MIN, model.FLOOR_AREA_MAX = grid
+
+            # Table of the wrong shape next to a matching key
+            np.save(prices_path, np.load(prices_path)[..., :-1])
+            params = _load_expecting_rebuild(version)
+            print(f"{version}: wrong shape, {_check_prices(params, _read_cfg(version))} prices match")
+        finally:
+            model.MODELS_DIR = models_dir
+            model.FLOOR_AREA_MIN, model.FLOOR_AREA_MAX = grid
+            predict_price.cache_clear()
+
+
+def main(versions: list[str]) -> None:
+    try:
+        for version in versions or available_versions():
+            check_version(version)
+    except AssertionError as e:
+        sys.exit(f"FAILED: {e}")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,288 @@
+import functools
+import hashlib
+import json
+import math
+import types
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Coefficient tables from training output, one JSON file per model version
+MODELS_DIR = Path(__file__).parent / "models"
+
+# Borough preselected in the UI
+DEFAULT_DISTRICT = "Hackney"
+
+# Input grid offered by the UI widgets (floor area in m²)
+FLOOR_AREA_MIN = 15
+FLOOR_AREA_MAX = 500
+FLOOR_AREA_STEP = 5
+ROOMS_MIN = 1
+ROOMS_MAX = 10
+
+# Sale year every estimate is made for
+SALE_YEAR = 2025
+
+# Bump whenever the way the price table is derived changes, so saved tables
+# built by older code are rejected
+PRICE_TABLE_FORMAT = 2
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ModelParams:
+    """
+    Regression coefficients plus the constants precomputed from them.
+    Compared and hashed by identity, so a loaded model can key predict_price's cache.
+    """
+    # Category names in display order; widgets return an index into these and
+    # the parallel coefficient / multiplier arrays below
+    district_names: tuple[str, ...]
+    property_type_names: tuple[str, ...]
+    default_district_idx: int
+    # float32 coefficients, only used by predict_price_batch
+    district_coef_arr: np.ndarray
+    property_type_coef_arr: np.ndarray
+    # float64 exp of each coefficient, shown in the calculation breakdown
+    district_mult_arr: np.ndarray
+    property_type_mult_arr: np.ndarray
+    coef_old_new: float
+    # Scaling folded into the coefficients (per log1p m² and per room)
+    floor_area_log_coef: float
+    rooms_coef: float
+    # Constant log-price offsets from the scaling means
+    floor_area_log_add: float
+    rooms_log_add: float
+    # Model error (for confidence interval)
+    rmse_log: float
+    precomp_base_price: float
+    # Constant factors shown in the calculation breakdown
+    base_price: float
+    sale_year_mult: float
+    # Price multiplier for every (district, property type, new build) combination
+    discrete_mult: np.ndarray
+    # Price multiplier for every (floor area step, rooms) point on the input grid
+    cont_mult: np.ndarray
+    # Price for every point of the input grid, indexed
+    # (district, property type, new build, floor area step, rooms)
+    prices: np.ndarray
+
+
+def available_versions() -> list[str]:
+    """
+    Model versions with a coefficient file in MODELS_DIR, oldest first.
+    """
+    return sorted(path.stem for path in MODELS_DIR.glob("*.json"))
+
+
+def _read_config(version: str) -> tuple[dict, str]:
+    """
+    Parse a model version's coefficient file. Also returns the key a saved price table
+    must carry to be reused: a SHA-256 over the JSON bytes and everything in this
+    module the table depends on (input grid, sale year, table format).
+    """
+    raw = (MODELS_DIR / f"{version}.json").read_bytes()
+    payload = json.dumps({
+        "source_sha256": hashlib.sha256(raw).hexdigest(),
+        "floor_area_grid": [FLOOR_AREA_MIN, FLOOR_AREA_MAX, FLOOR_AREA_STEP],
+        "rooms_grid": [ROOMS_MIN, ROOMS_MAX],
+        "sale_year": SALE_YEAR,
+        "format": PRICE_TABLE_FORMAT,
+    }, sort_keys=True)
+    return json.loads(raw), hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _derive_params(cfg: dict) -> dict:
+    """
+    Every ModelParams field except the price table, computed from the coefficients.
+    """
+    # Precomputed constants (sale year is fixed at SALE_YEAR)
+    inv_floor_area_log_std = 1.0 / cfg["floor_area_log_std"]
+    inv_rooms_std = 1.0 / cfg["rooms_std"]
+    sale_year_log_add = (
+        cfg["coef_sale_year_scaled"] * (SALE_YEAR - cfg["sale_year_mean"]) / cfg["sale_year_std"]
+    )
+    floor_area_log_add = (
+        -cfg["coef_total_floor_area_scaled"] * cfg["floor_area_log_mean"] * inv_floor_area_log_std
+    )
+    rooms_log_add = -cfg["coef_number_habitable_rooms_scaled"] * cfg["rooms_mean"] * inv_rooms_std
+    floor_area_log_coef = cfg["coef_total_floor_area_scaled"] * inv_floor_area_log_std
+    rooms_coef = cfg["coef_number_habitable_rooms_scaled"] * inv_rooms_std
+    precomp_intercept = cfg["intercept"] + sale_year_log_add + floor_area_log_add + rooms_log_add
+
+    # Struct-of-arrays layout indexed by category code. Everything the single-property
+    # path reads is float64; the float32 copies only halve the footprint for batch scoring
+    district_coefs = cfg["district_coefs"]
+    property_type_coefs = cfg["property_type_coefs"]
+    district_names = tuple(sorted(district_coefs))
+    property_type_names = tuple(property_type_coefs)
+    district_coef_f64 = np.fromiter((district_coefs[n] for n in district_names), dtype=np.float64)
+    property_type_coef_f64 = np.fromiter(
+        (property_type_coefs[n] for n in property_type_names), dtype=np.float64
+    )
+
+    # Precomputed price multipliers (exp of the constant and categorical terms, and
+    # of the continuous terms over the input grid)
+    discrete_mult = np.exp(
+        precomp_intercept
+        + district_coef_f64[:, None, None]
+        + property_type_coef_f64[None, :, None]
+        + cfg["coef_old_new"] * np.array([0.0, 1.0])
+    )
+    cont_mult = np.exp(
+        floor_area_log_coef
+        * np.log1p(np.arange(FLOOR_AREA_MIN, FLOOR_AREA_MAX + 1, FLOOR_AREA_STEP))[:, None]
+        + rooms_coef * np.arange(ROOMS_MIN, ROOMS_MAX + 1)[None, :]
+    )
+
+    return dict(
+        district_names=district_names,
+        property_type_names=property_type_names,
+        default_district_idx=district_names.index(DEFAULT_DISTRICT),
+        district_coef_arr=district_coef_f64.astype(np.float32),
+        property_type_coef_arr=property_type_coef_f64.astype(np.float32),
+        district_mult_arr=np.exp(district_coef_f64),
+        property_type_mult_arr=np.exp(property_type_coef_f64),
+        coef_old_new=cfg["coef_old_new"],
+        floor_area_log_coef=floor_area_log_coef,
+        rooms_coef=rooms_coef,
+        floor_area_log_add=floor_area_log_add,
+        rooms_log_add=rooms_log_add,
+        rmse_log=cfg["rmse_log"],
+        precomp_base_price=math.exp(precomp_intercept),
+        base_price=math.exp(cfg["intercept"]),
+        sale_year_mult=math.exp(sale_year_log_add),
+        discrete_mult=discrete_mult,
+        cont_mult=cont_mult,
+    )
+
+
+def build_price_table(discrete_mult: np.ndarray, cont_mult: np.ndarray) -> np.ndarray:
+    """
+    Outer product of the discrete and continuous multipliers. Kept in float64 (about
+    4 MB): at the top of the table float32 spacing is £0.50, enough to change the
+    displayed whole-pound estimate.
+    """
+    return discrete_mult[:, :, :, None, None] * cont_mult[None, None, None, :, :]
+
+
+def compute_price_table(version: str) -> tuple[np.ndarray, str]:
+    """
+    Build a version's price table from its JSON, without reading any saved table.
+    Returns the table and the key identifying what it was built from.
+    """
+    cfg, table_key = _read_config(version)
+    params = _derive_params(cfg)
+    return build_price_table(params["discrete_mult"], params["cont_mult"]), table_key
+
+
+def price_table_paths(version: str) -> tuple[Path, Path]:
+    """
+    Location of a version's saved price table and of the table-key file beside it.
+    """
+    return MODELS_DIR / f"{version}_prices.npy", MODELS_DIR / f"{version}_prices.sha256"
+
+
+def load_model(version: str) -> ModelParams:
+    """
+    Read the coefficients for a model version and precompute the derived constants.
+    """
+    cfg, table_key = _read_config(version)
+    params = _derive_params(cfg)
+    expected_shape = params["discrete_mult"].shape + params["cont_mult"].shape
+
+    # Full price table, memory-mapped from the file written by build_price_table.py.
+    # It is only used if its key matches (same JSON, grid, sale year and table
+    # format) and it has the expected shape; otherwise it is rebuilt in memory (a few ms).
+    prices_path, hash_path = price_table_paths(version)
+    prices = None
+    if prices_path.exists() and hash_path.exists():
+        if hash_path.read_text(encoding="utf-8").strip() == table_key:
+            prices = np.load(prices_path, mmap_mode="r")
+            if prices.shape != expected_shape:
+                prices = None
+    if prices is None:
+        if prices_path.exists():
+            warnings.warn(
+                f"{prices_path.name} is out of date for {version}.json or this version "
+                "of model.py; rebuilding it in memory (run build_price_table.py to "
+                "refresh the saved table)",
+                stacklevel=2,
+            )
+        prices = build_price_table(params["discrete_mult"], params["cont_mult"])
+
+    return ModelParams(**params, prices=prices)
+
+
+@functools.lru_cache(maxsize=512)
+def predict_price(model: ModelParams, district_idx: int, property_type_idx: int, floor_area: int,
+                  num_rooms: int, is_new_build: bool) -> float:
+    """
+    Predict house price using the linear regression coefficients.
+    Borough and property type are passed as indices into model.district_names and
+    model.property_type_names. Returns price in GBP.
+    Results are memoized, so repeat inputs are a cache hit.
+    """
+    # Whole-number floats (75.0) share a cache key with ints, so index them the same way;
+    # any other float is off the grid
+    on_grid = floor_area == int(floor_area) and num_rooms == int(num_rooms)
+    if on_grid:
+        floor_area_idx, off_step = divmod(int(floor_area) - FLOOR_AREA_MIN, FLOOR_AREA_STEP)
+        on_grid = (not off_step and 0 <= floor_area_idx < model.prices.shape[3]
+                   and ROOMS_MIN <= num_rooms <= ROOMS_MAX)
+    if not on_grid:
+        # Typed-in values between widget steps fall back to the direct calculation
+        # (floor area is log-transformed first)
+        return (
+            float(model.discrete_mult[district_idx, property_type_idx, int(is_new_build)])
+            * math.exp(model.floor_area_log_coef * math.log1p(floor_area)
+                       + model.rooms_coef * num_rooms)
+        )
+
+    # Everything else is a single read from the precomputed price table
+    return float(model.prices[district_idx, property_type_idx, int(is_new_build),
+                              floor_area_idx, int(num_rooms) - ROOMS_MIN])
+
+
+@functools.lru_cache(maxsize=512)
+def price_breakdown(model: ModelParams, district_idx: int, property_type_idx: int, floor_area: int,
+                    num_rooms: int, is_new_build: bool) -> types.MappingProxyType:
+    """
+    Per-factor price multipliers behind predict_price for the same inputs, ready to
+    display. Results are memoized, so reopening a breakdown is a cache hit; the
+    mapping is read-only because every caller shares the cached object.
+    """
+    # Scaled continuous terms (floor area is log-transformed first)
+    floor_area_term = model.floor_area_log_coef * math.log1p(floor_area) + model.floor_area_log_add
+    rooms_term = model.rooms_coef * num_rooms + model.rooms_log_add
+
+    return types.MappingProxyType({
+        "base_price": model.base_price,
+        "district": float(model.district_mult_arr[district_idx]),
+        "property_type": float(model.property_type_mult_arr[property_type_idx]),
+        "new_build": math.exp(model.coef_old_new * float(is_new_build)),
+        "sale_year": model.sale_year_mult,
+        "floor_area": math.exp(floor_area_term),
+        "rooms": math.exp(rooms_term),
+    })
+
+
+def predict_price_batch(model: ModelParams, district_idx: np.ndarray, property_type_idx: np.ndarray,
+                        floor_area: np.ndarray, num_rooms: np.ndarray,
+                        is_new_build: np.ndarray) -> np.ndarray:
+    """
+    Vectorized predict_price over N properties; each argument is an array of length N.
+    Returns a float32 array of prices in GBP.
+    """
+    # Sum every log-price term over the whole batch, then take a single exp;
+    # all scratch arrays are float32 to match the coefficient arrays
+    log_price = (
+        model.district_coef_arr[np.asarray(district_idx, dtype=np.intp)]
+        + model.property_type_coef_arr[np.asarray(property_type_idx, dtype=np.intp)]
+        + np.float32(model.floor_area_log_coef) * np.log1p(np.asarray(floor_area, dtype=np.float32))
+        + np.float32(model.rooms_coef) * np.asarray(num_rooms, dtype=np.float32)
+        + np.float32(model.coef_old_new) * np.asarray(is_new_build).astype(np.float32)
+    )
+
+    return np.float32(model.precomp_base_price) * np.exp(log_price)